@@ -2,13 +2,12 @@
 
 import sys
 from pathlib import Path
-import os
 
 # --- Set up Path for Imports ---
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent)) 
 
 from src.validators import validate_jsonl_file
-from src.infrastructure import logger
+from src.infrastructure import logger, scan_jsonl_files
 from src.config import RAW_DATA_DIR, PROCESSED_DATA_DIR
 
 
@@ -45,11 +44,11 @@ def main():
     """Main entry point to audit the most recent raw and processed files."""
     
     # 1. Audit the most recent RAW file
-    raw_files = list(RAW_DATA_DIR.glob("*.jsonl"))
+    raw_files = scan_jsonl_files(RAW_DATA_DIR)
     if raw_files:
-        # Sort by creation time to get the newest one
-        newest_raw = max(raw_files, key=os.path.getctime)
-        audit_existing_dataset(newest_raw)
+        # Sort by creation time to get the newest one (DirEntry.stat() is cached)
+        newest_raw = max(raw_files, key=lambda entry: entry.stat().st_ctime)
+        audit_existing_dataset(Path(newest_raw.path))
     else:
         logger.warning(f"No raw data files found in {RAW_DATA_DIR}.")
 
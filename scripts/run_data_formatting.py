@@ -1,50 +1,157 @@
+import os
 import sys
+import json
 from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import TypeAdapter
 
 # --- Set up Path for Imports ---
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent)) 
 
-from src.config import PROCESSED_DATA_DIR, RAW_DATA_DIR
-from src.infrastructure import logger
+from src.config import CACHE_DIR, PROCESSED_DATA_DIR, RAW_DATA_DIR
+from src import validators
+from src.infrastructure import logger, scan_jsonl_files, dedup_key
+from src.schemas import TrainingExample
 from src.data import (
     load_and_validate_data, 
     stratified_split, 
     save_dataset
 )
 
+# Validated + deduplicated aggregate of RAW_DATA_DIR, reused while the raw files and validation rules are unchanged.
+# Records are stored as typed, nested Parquet columns (not JSON strings), so a hit skips the
+# JSONL parse and the DataValidator pass and only re-hydrates the models in one TypeAdapter call.
+AGGREGATE_CACHE = CACHE_DIR / "raw_aggregate.parquet"
+# Bump when the cached layout or the validation/dedup logic changes, so stale aggregates are rebuilt
+AGGREGATE_CACHE_VERSION = 2
+
+_TRAINING_EXAMPLES = TypeAdapter(List[TrainingExample])
+
+
+def _source_fingerprint(raw_entries: List[os.DirEntry]) -> bytes:
+    """
+    Names, sizes and mtimes of the raw inputs, plus the thresholds DataValidator filtered them with.
+    Any change (including a threshold overridden via env) invalidates the aggregate cache;
+    generation/concurrency settings don't affect the aggregate and aren't part of the key.
+    """
+    entries = []
+    for entry in raw_entries:
+        st = entry.stat()
+        entries.append((entry.name, st.st_size, st.st_mtime_ns))
+    return json.dumps({
+        "version": AGGREGATE_CACHE_VERSION,
+        "thresholds": [
+            validators.MIN_QUERY_LENGTH,
+            validators.MIN_THOUGHT_WORDS,
+            validators.MAX_THOUGHT_WORDS,
+            validators.MIN_FINAL_ANSWER_LENGTH,
+            validators.PARROTING_THRESHOLD,
+        ],
+        "sources": sorted(entries),
+    }).encode("utf-8")
+
+
+def _drop_nulls(value: Any) -> Any:
+    """Arrow fills every struct field missing from a row with null; strip them to get the exclude_none dump back."""
+    if isinstance(value, dict):
+        return {k: _drop_nulls(v) for k, v in value.items() if v is not None}
+    return value
+
+
+def _load_aggregate_cache(fingerprint: bytes) -> Optional[Tuple[List[TrainingExample], int]]:
+    """Returns (items, duplicates removed) if the cache was built from exactly these inputs, else None."""
+    if not AGGREGATE_CACHE.exists():
+        return None
+    try:
+        # Footer only: a stale cache is rejected without reading any row data
+        metadata = pq.read_schema(AGGREGATE_CACHE).metadata or {}
+        if metadata.get(b"sources") != fingerprint:
+            return None
+        rows = pq.read_table(AGGREGATE_CACHE).to_pylist()
+        items = _TRAINING_EXAMPLES.validate_python([_drop_nulls(row) for row in rows])
+        return items, int(metadata.get(b"duplicates", b"0"))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable aggregate cache {AGGREGATE_CACHE.name}: {e}")
+        return None
+
+
+def _write_aggregate_cache(items: List[TrainingExample], duplicates_count: int, fingerprint: bytes) -> None:
+    # Nested dumps become struct columns; repeated strings (status, tool_name, mode) get dictionary-encoded
+    table = pa.Table.from_pylist([item.model_dump(mode="json", exclude_none=True) for item in items])
+    table = table.replace_schema_metadata({"sources": fingerprint, "duplicates": str(duplicates_count)})
+    pq.write_table(table, AGGREGATE_CACHE, compression="zstd")
+
+
+def _aggregate_raw_files(jsonl_files: List[Path]) -> Tuple[List[TrainingExample], int, int]:
+    """Validates every raw file and returns (unique items, duplicates removed, files that failed)."""
+    all_valid_data = []
+    seen_hashes: set[bytes] = set() # For Deduplication (digests, not full strings)
+    duplicates_count = 0
+    failed_files = 0
+
+    # Files are independent, so parse + validate them on all cores.
+    # Results are merged in file order on the main process, keeping dedup single-threaded and deterministic.
+    max_workers = min(len(jsonl_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # NOTE: load_and_validate_data handles Pydantic and Semantic checks internally
+        futures = [
+            (input_file, executor.submit(load_and_validate_data, input_file, use_full_validation=True))
+            for input_file in jsonl_files
+        ]
+
+        for input_file, future in futures:
+            logger.info(f"Reading: {input_file.name}")
+            try:
+                data = future.result()
+
+                # Add to master list with Deduplication
+                for item in data:
+                    query_key = dedup_key(item.user_query.encode("utf-8"))
+                    if query_key not in seen_hashes:
+                        seen_hashes.add(query_key)
+                        all_valid_data.append(item)
+                    else:
+                        duplicates_count += 1
+
+            except Exception as e:
+                logger.warning(f"Failed to process {input_file.name}: {e}. Skipping file.")
+                failed_files += 1
+                continue
+
+    return all_valid_data, duplicates_count, failed_files
+
+
 def run_data_formatting():
     logger.info("--- Starting Data Formatting and Split Pipeline ---")
 
     # 1. FIND ALL FILES
-    jsonl_files = list(RAW_DATA_DIR.glob("*.jsonl"))
+    raw_entries = scan_jsonl_files(RAW_DATA_DIR)
+    jsonl_files = [Path(entry.path) for entry in raw_entries]
     if not jsonl_files:
         logger.error(f"No JSONL files found in {RAW_DATA_DIR}. Please run data generation first.")
         return
     
     logger.info(f"Found {len(jsonl_files)} raw files to process.")
 
-    # 2. AGGREGATE DATA
-    all_valid_data = []
-    seen_queries = set() # For Deduplication
-    duplicates_count = 0
+    # 2. AGGREGATE DATA (skipped when the cached aggregate matches the raw files)
+    fingerprint = _source_fingerprint(raw_entries)
+    cached = _load_aggregate_cache(fingerprint)
 
-    for input_file in jsonl_files:
-        logger.info(f"Reading: {input_file.name}")
-        try:
-            # NOTE: This function handles Pydantic and Semantic checks internally
-            data = load_and_validate_data(input_file, use_full_validation=True)            
-
-            # Add to master list with Deduplication
-            for item in data:
-                if item.user_query not in seen_queries:
-                    seen_queries.add(item.user_query)
-                    all_valid_data.append(item)
-                else:
-                    duplicates_count += 1
-
-        except Exception as e:
-            logger.warning(f"Failed to process {input_file.name}: {e}. Skipping file.")
-            continue
+    if cached is not None:
+        all_valid_data, duplicates_count = cached
+        logger.info(f"Raw files and validation rules unchanged. Loaded validated aggregate from {AGGREGATE_CACHE.name}.")
+    else:
+        all_valid_data, duplicates_count, failed_files = _aggregate_raw_files(jsonl_files)
+        # A partial aggregate must not be cached: the fingerprint covers the failed files too,
+        # so the next run would hit the cache and silently drop their data
+        if failed_files:
+            logger.warning(f"{failed_files} file(s) failed; not caching this aggregate.")
+        elif all_valid_data:
+            _write_aggregate_cache(all_valid_data, duplicates_count, fingerprint)
     
     if not all_valid_data:
         logger.error("No valid data found in any files. Exiting.")
@@ -0,0 +1,136 @@
+import sys
+import math
+import random
+import asyncio
+from pathlib import Path
+from datetime import datetime
+
+# --- Set up Path for Imports ---
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tqdm import tqdm
+
+try:
+    # Optional: libuv-backed event loop for faster socket IO (not available on Windows)
+    import uvloop
+except ImportError:
+    uvloop = None
+
+from src.config import (
+    RAW_DATA_DIR,
+    INTENT_DISTRIBUTION,
+    INTENT_CUM_WEIGHTS,
+    DOMAINS,
+    PERSONAS,
+    TOTAL_TARGET,
+    VALIDATION_CONFIG,
+)
+from src.infrastructure import logger
+from src.data import generate_batch, save_batch_from_models, JsonlWriter, BATCH_OUTCOMES
+
+BATCH_SIZE = VALIDATION_CONFIG.GENERATION_BATCH_SIZE
+MAX_CONCURRENT_BATCHES = VALIDATION_CONFIG.MAX_CONCURRENT_BATCHES
+REQUESTS_PER_MINUTE = VALIDATION_CONFIG.REQUESTS_PER_MINUTE
+
+
+async def _generate_one(intent_config, domain, persona, semaphore: asyncio.Semaphore, queue: asyncio.Queue):
+    """Fetches one batch for the given (intent, domain, persona) and hands it to the writer."""
+    # Rate limiting (per model, retries included) happens inside generate_batch
+    async with semaphore:
+        batch_items = await generate_batch(intent_config, domain, persona, batch_size=BATCH_SIZE)
+
+    if batch_items:
+        await queue.put(batch_items)
+
+
+async def _writer(queue: asyncio.Queue, jsonl_writer: JsonlWriter, pbar: tqdm) -> None:
+    """Single consumer: validates and appends batches so file IO never races between coroutines."""
+    while True:
+        batch_items = await queue.get()
+        try:
+            if batch_items is None:
+                break
+            # Inline on purpose: validating a ~5 item batch is far cheaper than a thread hand-off
+            valid_count = save_batch_from_models(batch_items, jsonl_writer)
+            pbar.update(valid_count)
+        finally:
+            # Always acknowledge, so a failed save can't leave queue.join() waiting forever
+            queue.task_done()
+
+
+async def _drain(queue: asyncio.Queue, writer: asyncio.Task) -> None:
+    """Waits until the writer has consumed every queued batch; re-raises if the writer died first."""
+    join_task = asyncio.create_task(queue.join())
+    try:
+        await asyncio.wait({join_task, writer}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        join_task.cancel()
+    if writer.done():
+        # Surfaces the writer's exception; a writer that returned early is a bug, not a drained queue
+        writer.result()
+        raise RuntimeError("Writer stopped before the queue was drained.")
+
+
+async def run_data_generation():
+    logger.info("--- Starting Synthetic Data Generation Pipeline ---")
+
+    output_file = RAW_DATA_DIR / f"router_train_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+    logger.info(f"Target: {TOTAL_TARGET} examples -> {output_file.name}")
+    logger.info(f"Concurrency: {MAX_CONCURRENT_BATCHES} batches in flight, {REQUESTS_PER_MINUTE} RPM budget per model")
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    # Redraw at most once a second; with concurrent batches, refreshes are the cost
+    pbar = tqdm(total=TOTAL_TARGET, desc="Generators", unit="ex", mininterval=1.0, smoothing=0.1)
+    jsonl_writer = JsonlWriter(output_file)
+    jsonl_writer.open()
+    writer = asyncio.create_task(_writer(queue, jsonl_writer, pbar))
+
+    try:
+        # Validation drops a share of every batch, so keep issuing rounds until the target is met.
+        # A round that yields nothing means the providers are failing; stop instead of spinning.
+        while pbar.n < TOTAL_TARGET:
+            saved_before = pbar.n
+            total_loops = math.ceil((TOTAL_TARGET - pbar.n) / BATCH_SIZE)
+
+            # Draw the whole round's configs up front against precomputed cumulative weights
+            intents = random.choices(INTENT_DISTRIBUTION, cum_weights=INTENT_CUM_WEIGHTS, k=total_loops)
+            domains = random.choices(DOMAINS, k=total_loops)
+            personas = random.choices(PERSONAS, k=total_loops)
+
+            tasks = [
+                _generate_one(intent_config, domain, persona, semaphore, queue)
+                for intent_config, domain, persona in zip(intents, domains, personas)
+            ]
+            await asyncio.gather(*tasks)
+            # Let the writer drain everything produced in this round before checking progress
+            await _drain(queue, writer)
+
+            if pbar.n == saved_before:
+                logger.error("No valid examples produced in the last round. Aborting generation.")
+                break
+    finally:
+        try:
+            if not writer.done():
+                await queue.put(None)
+                await writer
+        finally:
+            # Flush whatever the writer buffered, even if it (or the round) failed
+            jsonl_writer.close()
+            pbar.close()
+            # A run that saved nothing shouldn't leave a 0-byte file behind for formatting to pick up
+            if output_file.stat().st_size == 0:
+                output_file.unlink()
+
+    # Throttled batches are counted apart from failures, so a quota problem doesn't look like bad output
+    logger.info(f"Batch outcomes: {dict(BATCH_OUTCOMES)}")
+    if pbar.n == 0:
+        logger.warning(f"--- Generation produced no examples; removed empty {output_file.name} ---")
+        return
+    logger.info(f"--- Generation Complete. Saved {pbar.n} examples to {output_file} ---")
+
+
+if __name__ == "__main__":
+    runner = uvloop.run if uvloop is not None else asyncio.run
+    runner(run_data_generation())
@@ -2,6 +2,8 @@
 Configuration settings for the Synthetic Data Generator.
 """
 import os
+from dataclasses import dataclass
+from itertools import accumulate
 from pathlib import Path
 from dotenv import load_dotenv
 from pydantic import ConfigDict
@@ -14,11 +16,13 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
+CACHE_DIR = DATA_DIR / "cache"
 LOG_DIR = BASE_DIR / "logs"
 
 # Ensure directories exist
 RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 # =============================================================================
@@ -50,7 +54,7 @@ FALLBACK_MODEL = "llama-3.1-8b-instant"
 # GENERATION SETTINGS
 # =============================================================================
 
-DOMAINS = [
+DOMAINS = (
     "E-Commerce API", "Video Game Engine", "Crypto Trading Bot",
     "Machine Learning Pipeline", "Legacy Banking System", "Healthcare EMR",
     "IoT Fleet Management", "Real-Time Analytics", "Embedded Robotics",
@@ -64,9 +68,9 @@ DOMAINS = [
     "Municipal Traffic Control", "Insurance Claims Processing", "Energy Trading Platform",
     "Clinical Trial Management", "Subscription Box Fulfillment", "Fraud Detection System",
     "Virtual Event Platform", "Construction Project Tracker", "Fleet Telematics API"
-]
+)
 
-PERSONAS = [
+PERSONAS = (
     # Original personas
     "Junior Intern (Vague, nervous, uses simple language)",
     "Senior Engineer (Technical, precise, mentions specific patterns/frameworks)",
@@ -103,10 +107,10 @@ PERSONAS = [
     "Academic Advisor (Theoretical approach, literature references, novel algorithms)",
     "Regulatory Inspector (Certification requirements, evidence collection, standards)",
     "Startup Technical Co-founder (Scrappy, hacky solutions, rapid iteration)"
-]
+)
 
 # THE GOLDEN DISTRIBUTION 
-INTENT_DISTRIBUTION = [
+INTENT_DISTRIBUTION = (
     # TOOLS (85%)
     {
         "intent": "search",
@@ -139,7 +143,11 @@ INTENT_DISTRIBUTION = [
         "weight": 0.15,
         "desc": "Provide explanations, clarify concepts, respond to casual questions, handle requests that can't be executed programmatically, explain error messages, suggest approaches, discuss trade-offs, offer best practices, give historical context, or provide education."
     }
-]
+)
+
+# Flat views for weighted sampling, built once instead of per draw
+INTENT_WEIGHTS = tuple(x["weight"] for x in INTENT_DISTRIBUTION)
+INTENT_CUM_WEIGHTS = tuple(accumulate(INTENT_WEIGHTS))
 
 QUERY_STYLES = {
     # ==========================================
@@ -439,6 +447,34 @@ QUERY_STYLES = {
     }
 }
 
+# Style keys grouped by the sections above. Generation samples a category first, then a
+# style, so the routing-specific styles aren't diluted by sheer count of the generic ones.
+BASIC_STYLES = (
+    "direct", "question", "problem", "context", "urgent", "confused", "comparative", "exploratory",
+)
+EMOTIONAL_STYLES = (
+    "imperative", "passive_aggressive", "overly_polite", "emotional", "sarcastic", "delegating",
+)
+STRUCTURAL_STYLES = (
+    "hypothetical", "narrative", "fragmented", "acronym_heavy", "code_mixed", "multi_part",
+    "follow_up", "specification", "diagnostic", "minimal", "verbose", "rubber_duck", "checklist",
+    "screenshot_dependent", "time_constrained", "cross_functional", "philosophical",
+)
+ROUTING_STYLES = (
+    "implicit_search", "implicit_execute", "implicit_modify", "implicit_escalate", "ambiguous_intent",
+    "chained_request", "conditional_logic", "negative_phrasing", "assumption_laden", "tool_agnostic",
+    "meta_request", "partial_path", "error_dump", "permission_uncertain", "scope_creep",
+    "false_precision", "tool_name_dropped", "read_only_intent", "mutation_intent", "validation_request",
+    "documentation_query", "precedent_seeking", "configuration_query", "ownership_question",
+    "impact_analysis", "compatibility_check", "optimization_vague", "security_paranoid",
+    "regex_embedded", "json_payload", "file_path_present", "function_signature", "env_var_reference",
+    "dependency_question", "historical_context", "testing_scenario", "migration_inquiry",
+    "integration_question", "rollback_concern",
+)
+QUERY_STYLE_CATEGORIES = (BASIC_STYLES, EMOTIONAL_STYLES, STRUCTURAL_STYLES, ROUTING_STYLES)
+QUERY_STYLE_CATEGORY_WEIGHTS = (1, 1, 2, 6)
+QUERY_STYLE_CATEGORY_CUM_WEIGHTS = tuple(accumulate(QUERY_STYLE_CATEGORY_WEIGHTS))
+
 # --- THE SINGLE SOURCE OF TRUTH ---
 SYSTEM_PROMPT = """You are the Semantic Brain of an autonomous AI engineer.
 Your role is to route user queries to the correct tool or answer directly.
@@ -454,22 +490,30 @@ OUTPUT RULES:
 BASE_CONFIG = ConfigDict(extra="ignore")
 
 # --- VALIDATION CONFIGURATION ---
-VALIDATION_CONFIG = {
+@dataclass(frozen=True, slots=True)
+class _ValidationConfig:
+    """Read-only pipeline thresholds; attribute access is a slot load instead of a dict probe."""
     # Quality Checks
-    "MIN_QUERY_LENGTH": int(os.getenv("MIN_QUERY_LENGTH", 5)),
-    "MIN_THOUGHT_WORDS": int(os.getenv("MIN_THOUGHT_WORDS", 8)),
-    "MAX_THOUGHT_WORDS": int(os.getenv("MAX_THOUGHT_WORDS", 100)),
-    "MIN_FINAL_ANSWER_LENGTH": int(os.getenv("MIN_FINAL_ANSWER_LENGTH", 10)),
-    "PARROTING_THRESHOLD": float(os.getenv("PARROTING_THRESHOLD", 0.8)),
-    
+    MIN_QUERY_LENGTH: int = int(os.getenv("MIN_QUERY_LENGTH", 5))
+    MIN_THOUGHT_WORDS: int = int(os.getenv("MIN_THOUGHT_WORDS", 8))
+    MAX_THOUGHT_WORDS: int = int(os.getenv("MAX_THOUGHT_WORDS", 100))
+    MIN_FINAL_ANSWER_LENGTH: int = int(os.getenv("MIN_FINAL_ANSWER_LENGTH", 10))
+    PARROTING_THRESHOLD: float = float(os.getenv("PARROTING_THRESHOLD", 0.8))
+
     # Domain Checks
-    "MIN_SEARCH_QUERY_LENGTH": int(os.getenv("MIN_SEARCH_QUERY_LENGTH", 2)),
-    "MAX_FILE_SIZE_KB": int(os.getenv("MAX_FILE_SIZE_KB", 512)),
-    
+    MIN_SEARCH_QUERY_LENGTH: int = int(os.getenv("MIN_SEARCH_QUERY_LENGTH", 2))
+    MAX_FILE_SIZE_KB: int = int(os.getenv("MAX_FILE_SIZE_KB", 512))
+
     # Batching and Retry
-    "GENERATION_BATCH_SIZE": int(os.getenv("GENERATION_BATCH_SIZE", 5)),
-    "MAX_GENERATION_RETRIES": int(os.getenv("MAX_GENERATION_RETRIES", 4)),
-}
+    GENERATION_BATCH_SIZE: int = int(os.getenv("GENERATION_BATCH_SIZE", 5))
+    MAX_GENERATION_RETRIES: int = int(os.getenv("MAX_GENERATION_RETRIES", 4))
+
+    # Concurrency (requests in flight + provider RPM budget)
+    MAX_CONCURRENT_BATCHES: int = int(os.getenv("MAX_CONCURRENT_BATCHES", 4))
+    REQUESTS_PER_MINUTE: int = int(os.getenv("REQUESTS_PER_MINUTE", 15))
+
+
+VALIDATION_CONFIG = _ValidationConfig()
 
 TOTAL_TARGET = 20
 
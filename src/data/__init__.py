@@ -1,5 +1,11 @@
-from .io import save_batch_validated
-from .generation import generate_batch
+from .io import (
+    save_batch_validated,
+    save_batch_from_models,
+    save_batch_from_dicts,
+    JsonlWriter,
+    close_open_writers,
+)
+from .generation import generate_batch, BATCH_OUTCOMES
 from .formatting import (
     load_and_validate_data, 
     stratified_split, 
@@ -10,7 +16,12 @@ from .prompt_builder import build_generation_prompt
 
 __all__ = [
     "save_batch_validated",
+    "save_batch_from_models",
+    "save_batch_from_dicts",
+    "JsonlWriter",
+    "close_open_writers",
     "generate_batch",
+    "BATCH_OUTCOMES",
     "load_and_validate_data",
     "stratified_split",
     "save_dataset",
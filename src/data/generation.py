@@ -1,17 +1,61 @@
 import time
 import random
 import asyncio
-from typing import List, Dict, Any
+from collections import Counter, defaultdict
+from typing import List, Dict, Optional
 
 from pydantic import ValidationError
 from openai import RateLimitError, APIError
 
-from src.infrastructure import get_client, logger
-from src.schemas import BatchResponse
+from src.infrastructure import get_client, logger, AsyncRateLimiter
+from src.schemas import BatchResponse, TrainingExample
 from .prompt_builder import build_generation_prompt
-from src.config import GROQ_MODELS, FALLBACK_MODEL, QUERY_STYLES
+from src.config import (
+    GROQ_MODELS,
+    FALLBACK_MODEL,
+    VALIDATION_CONFIG,
+    QUERY_STYLE_CATEGORIES,
+    QUERY_STYLE_CATEGORY_CUM_WEIGHTS,
+)
 
-async def generate_batch(intent_config, domain, persona, batch_size=5, retry_count=0) -> List[Dict[str, Any]]:
+MAX_GENERATION_RETRIES = VALIDATION_CONFIG.MAX_GENERATION_RETRIES
+# A schema failure usually means the model really produced malformed output; rerolling the
+# same prompt more than once rarely helps and just burns tokens.
+MAX_SCHEMA_RETRIES = 1
+# Longest Retry-After we'll sleep through. Longer hints (e.g. daily-quota 429s) would hold a
+# semaphore slot for minutes, so the batch is abandoned instead.
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+# How each generate_batch call ended ("ok", "rate_limited", "schema_error", "api_error", "error"),
+# so a run can tell provider throttling apart from bad output or outages
+BATCH_OUTCOMES: Counter = Counter()
+
+# Process-wide token bucket per model (Groq quotas are per model). Every attempt, retries
+# included, waits here *before* calling, so concurrent coroutines don't all 429 at once.
+_MODEL_LIMITERS: Dict[str, AsyncRateLimiter] = defaultdict(
+    lambda: AsyncRateLimiter(VALIDATION_CONFIG.REQUESTS_PER_MINUTE, time_period=60)
+)
+
+
+def pick_query_style() -> str:
+    """Samples a style category by weight (routing-heavy), then a style uniformly within it."""
+    category = random.choices(QUERY_STYLE_CATEGORIES, cum_weights=QUERY_STYLE_CATEGORY_CUM_WEIGHTS)[0]
+    return random.choice(category)
+
+
+def _retry_after_seconds(error: RateLimitError) -> Optional[float]:
+    """Reads the provider's own wait hint (Retry-After header) from a 429 response, if present."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def generate_batch(intent_config, domain, persona, batch_size=5) -> List[TrainingExample]:
     """
     Generates a batch of examples using model roulette and exponential backoff.
     
@@ -20,58 +64,88 @@ async def generate_batch(intent_config, domain, persona, batch_size=5, retry_cou
         domain: The domain of the query (e.g., 'File I/O').
         persona: The persona of the user (e.g., 'Architect').
         batch_size: Number of examples to request.
-        retry_count: Current retry level for exponential backoff.
         
     Returns:
-        A list of validated dictionaries ready for saving.
+        A list of TrainingExample objects ready for save_batch_from_models.
     """
 
-    query_style = random.choice(list(QUERY_STYLES.keys()))
+    # Prompt is built once: a retry with a different prompt isn't really a retry
+    query_style = pick_query_style()
     prompt = build_generation_prompt(intent_config, domain, persona, query_style, batch_size)
-    
-    # 1. Select Model
-    if retry_count > 0:
-        model_id = FALLBACK_MODEL
-        logger.warning(f"  Retry #{retry_count}: Switching to Fallback ({model_id})")
-    else:
-        model_id = random.choice(GROQ_MODELS)
-    
+    messages = [{"role": "user", "content": prompt}]
+
+    model_id = random.choice(GROQ_MODELS)
     instructor_client = get_client()
 
-    try:
-        resp = await instructor_client.chat.completions.create(
-            model=model_id,
-            response_model=BatchResponse,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.85, # High diversity  
-            max_retries=2,
-        )
-
-        logger.info(f"   Success with {model_id.split('/')[-1]}. Generated {len(resp.items)} items.")
-        return resp.items
-
-    except RateLimitError as e:
-        wait_time = (2 ** retry_count) + random.uniform(1, 3)
-        logger.warning(f"   Rate Limit Hit. Waiting {wait_time:.2f}s.")
-        await asyncio.sleep(wait_time)
-        
-        if retry_count < 4:
-            return await generate_batch(intent_config, domain, persona, batch_size, retry_count + 1)
+    schema_failures = 0
+    outcome = "error"
+
+    # 1 initial attempt + up to MAX_GENERATION_RETRIES retries
+    for retry_count in range(MAX_GENERATION_RETRIES + 1):
+        # 1. Select Model (only the model changes between attempts)
+        if retry_count > 0:
+            model_id = FALLBACK_MODEL
+            logger.warning("  Retry #%d: Switching to Fallback (%s)", retry_count, model_id)
+
+        try:
+            await _MODEL_LIMITERS[model_id].acquire()
+            resp = await instructor_client.chat.completions.create(
+                model=model_id,
+                response_model=BatchResponse,
+                messages=messages,
+                temperature=0.85, # High diversity  
+                max_retries=2,
+            )
+
+            logger.info("   Success with %s. Generated %d items.", model_id.rpartition("/")[2], len(resp.items))
+            # Instructor already parsed BatchResponse; checked in debug runs only (stripped under -O)
+            assert all(isinstance(x, TrainingExample) for x in resp.items)
+            BATCH_OUTCOMES["ok"] += 1
+            return resp.items
+
+        except RateLimitError as e:
+            outcome = "rate_limited"
+            if retry_count >= MAX_GENERATION_RETRIES:
+                logger.error("   Rate Limit Hit on final attempt. Giving up on this batch.")
+                break
+
+            # Prefer the server's Retry-After (small jitter avoids synchronized wake-ups); else exponential backoff
+            retry_after = _retry_after_seconds(e)
+            if retry_after is not None and retry_after > MAX_RETRY_AFTER_SECONDS:
+                logger.warning(
+                    "   Rate Limit Hit; Retry-After is %.0fs (cap %.0fs). Dropping this batch.",
+                    retry_after, MAX_RETRY_AFTER_SECONDS,
+                )
+                break
+            if retry_after is not None:
+                wait_time = retry_after + random.uniform(0, 1)
+            else:
+                wait_time = (2 ** retry_count) + random.uniform(1, 3)
+            logger.warning("   Rate Limit Hit. Waiting %.2fs.", wait_time)
+            await asyncio.sleep(wait_time)
+            continue
+
+        except ValidationError as e:
+            # Schema validation error
+            outcome = "schema_error"
+            schema_failures += 1
+            if schema_failures <= MAX_SCHEMA_RETRIES and retry_count < MAX_GENERATION_RETRIES:
+                logger.warning("   Schema Validation failed. Retrying (Attempt %d).", retry_count + 1)
+                continue
+            logger.error("   Schema Validation failed %dx. Giving up: %s", schema_failures, e.errors())
 
-    except ValidationError as e:
-        # Schema validation error
-        logger.warning(f"   Schema Validation failed. Retrying (Attempt {retry_count + 1}).")
-        if retry_count < 3:
-            return await generate_batch(intent_config, domain, persona, batch_size, retry_count + 1)
+        except APIError as e:
+            # General API error (e.g., 500 server error, invalid key, etc.)
+            outcome = "api_error"
+            logger.error("   API Error (%s) on %s: %s", e.status_code, model_id.rpartition("/")[2], e.message)
+            # Do not retry general API errors immediately; they are often not transient
 
-    except APIError as e:
-        # General API error (e.g., 500 server error, invalid key, etc.)
-        logger.error(f"   API Error ({e.status_code}) on {model_id.split('/')[-1]}: {e.message}")
-        # Do not retry general API errors immediately; they are often not transient
-        pass 
+        except Exception as e:
+            # Catch any remaining unexpected errors (e.g., network timeout, unexpected Python error)
+            outcome = "error"
+            logger.exception("   Critical Unknown Error: %s", e) 
 
-    except Exception as e:
-        # Catch any remaining unexpected errors (e.g., network timeout, unexpected Python error)
-        logger.exception(f"   Critical Unknown Error: {e}") 
+        break
 
+    BATCH_OUTCOMES[outcome] += 1
     return [] # Final failure case
\ No newline at end of file
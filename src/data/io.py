@@ -1,55 +1,180 @@
+import os
 import json
-from typing import List, Union
+import atexit
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Union
 
 from src.schemas import TrainingExample
 from src.validators import DataValidator
 from src.infrastructure import logger 
 
+# Bound pydantic-core serializer: one C call per record, skipping the model_dump_json wrapper
+_DUMP_JSON = TrainingExample.__pydantic_serializer__.to_json
+# DataValidator holds no per-call state (thresholds are module constants), so one instance serves every batch
+_VALIDATOR = DataValidator()
 
-def save_batch_validated(batch_items: List[Union[dict, TrainingExample]], output_file: str) -> int:
+
+class JsonlWriter:
     """
-    Validates and saves a batch of TrainingExample objects to a JSONL file.
-    
-    CRITICAL: Uses model_dump_json(exclude_none=True) to remove null fields 
-    from the Discriminated Union, ensuring clean training data.
+    Long-lived append handle for a JSONL file.
+    Records are encoded into an in-memory buffer and written with a single write()
+    once the buffer crosses `flush_threshold`, instead of an open/append/close per batch.
+    The file is fsync'd once, on close.
     """
-    # 1. Ensure all items are Pydantic objects first
-    validated_pydantic_items = []
-    validator = DataValidator() 
-    
-    for item in batch_items:
-        if isinstance(item, dict):
+
+    FLUSH_THRESHOLD = 128 * 1024  # 128 KiB
+
+    def __init__(self, output_file: Union[str, Path], flush_threshold: int = FLUSH_THRESHOLD):
+        self.output_file = Path(output_file)
+        self.flush_threshold = flush_threshold
+        self._buf = bytearray()
+        self._fh = None
+
+    def __enter__(self) -> "JsonlWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def open(self) -> None:
+        if self._fh is None:
+            self._fh = open(self.output_file, "ab", buffering=0)
+
+    def write_items(self, items: List[TrainingExample]) -> None:
+        """Appends items as JSONL, flushing only when the buffer is full."""
+        for item in items:
+            # Serializer returns UTF-8 bytes directly: no intermediate dict or str
+            self._buf += _DUMP_JSON(item, exclude_none=True)
+            self._buf += b"\n"
+        if len(self._buf) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buf and self._fh is not None:
+            # Unbuffered FileIO.write may write fewer bytes than given; loop so nothing is
+            # dropped when the buffer is cleared
+            view = memoryview(self._buf)
             try:
-                # Attempt to coerce raw dicts into the target schema
-                item = TrainingExample(**item) 
-            except Exception as e:
-                logger.error(f"Pydantic Coercion Error on raw dict: {e}")
-                continue
-        validated_pydantic_items.append(item)
+                while view:
+                    view = view[self._fh.write(view):]
+            finally:
+                view.release()
+            self._buf.clear()
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._fh = None
+
+
+# Path-based callers share one handle per file for the whole process instead of reopening per batch.
+# They still flush before returning, so each call's records are on disk when it returns; only callers
+# that pass their own JsonlWriter get cross-call buffering.
+_OPEN_WRITERS: Dict[str, JsonlWriter] = {}
+
+
+def _get_writer(output_file: Union[str, Path]) -> JsonlWriter:
+    key = os.path.abspath(output_file)
+    writer = _OPEN_WRITERS.get(key)
+    if writer is None:
+        writer = _OPEN_WRITERS[key] = JsonlWriter(key)
+        writer.open()
+    return writer
+
+
+@atexit.register
+def close_open_writers() -> None:
+    """Flushes, fsyncs and closes every writer opened for path-based callers."""
+    while _OPEN_WRITERS:
+        _, writer = _OPEN_WRITERS.popitem()
+        writer.close()
+
+
+OutputTarget = Union[str, Path, JsonlWriter]
+
 
+def _write_validated(pydantic_items: List[TrainingExample], output_file: OutputTarget,
+                     batch_total: int, skip_structural: bool = False) -> int:
+    """Shared tail: applies custom/logic validation, then serializes and saves the survivors."""
     # 2. Apply Custom/Logic Validation (e.g., checking tool arguments)
     final_valid_items = []
     valid_count = 0
+    skip_counts = Counter()
 
-    for item in validated_pydantic_items:
-        result = validator.validate_full(item) 
+    for item in pydantic_items:
+        result = _VALIDATOR.validate_full(item, skip_structural=skip_structural) 
     
-    if result.is_valid:
-        final_valid_items.append(item)
-        valid_count += 1
-    else:
-        logger.warning(f"Validation failed, skipping item: {result.error_message}")
+        if result.is_valid:
+            final_valid_items.append(item)
+            valid_count += 1
+        else:
+            # Per-item reasons go to the debug log file; the console gets one breakdown per batch
+            skip_counts[result.error_type] += 1
+            logger.debug("Validation failed, skipping item: %s", result.error_message)
+
+    if skip_counts:
+        logger.warning("Skipped %d item(s) by reason: %s", sum(skip_counts.values()), dict(skip_counts))
     
     # 3. Serialize and Save
-    with open(output_file, "a", encoding="utf-8") as f:
-        for item in final_valid_items:
-            json_str = item.model_dump_json(exclude_none=True)
-            f.write(json_str + "\n")
-            
+    if isinstance(output_file, JsonlWriter):
+        writer = output_file
+        writer.write_items(final_valid_items)
+    else:
+        writer = _get_writer(output_file)
+        writer.write_items(final_valid_items)
+        writer.flush()
 
-    logger.info(f"Successfully saved {valid_count}/{len(batch_items)} items to {output_file}.")            
+    logger.info("Successfully saved %d/%d items to %s.", valid_count, batch_total, writer.output_file)
     return valid_count
 
+
+def save_batch_from_models(batch_items: List[TrainingExample], output_file: OutputTarget) -> int:
+    """
+    Validates and saves a batch that is already TrainingExample objects
+    (e.g. generate_batch results). No per-item type dispatch.
+    """
+    return _write_validated(batch_items, output_file, len(batch_items))
+
+
+def save_batch_from_dicts(batch_items: List[dict], output_file: OutputTarget) -> int:
+    """
+    Coerces raw dicts into TrainingExample, then validates and saves them.
+    Structural checks are skipped: Pydantic has just run them during coercion.
+    """
+    # 1. Ensure all items are Pydantic objects first
+    validated_pydantic_items = []
+    for item in batch_items:
+        try:
+            # Attempt to coerce raw dicts into the target schema
+            validated_pydantic_items.append(TrainingExample(**item))
+        except Exception as e:
+            logger.error("Pydantic Coercion Error on raw dict: %s", e)
+
+    return _write_validated(validated_pydantic_items, output_file, len(batch_items), skip_structural=True)
+
+
+def save_batch_validated(batch_items: List[TrainingExample], output_file: OutputTarget) -> int:
+    """
+    Validates and saves a batch of TrainingExample objects to a JSONL file.
+    
+    CRITICAL: Uses model_dump_json(exclude_none=True) to remove null fields 
+    from the Discriminated Union, ensuring clean training data.
+
+    Pass a JsonlWriter as `output_file` to buffer across calls and control the handle's lifetime;
+    plain paths reuse a process-wide handle per file (see close_open_writers) but are flushed
+    before returning.
+
+    Items must already be TrainingExample (generate_batch guarantees this); raw dicts
+    go through save_batch_from_dicts instead.
+    """
+    return save_batch_from_models(batch_items, output_file)
+
 # Alternative: Batch validation version (more efficient for large batches)
 def save_batch_optimized(batch_items: List[TrainingExample], output_file: str) -> int:
     """
@@ -61,14 +186,13 @@ def save_batch_optimized(batch_items: List[TrainingExample], output_file: str) -
     # Validate all items at once
     valid_items, stats = validate_batch(batch_items, strict=True, log_errors=True)
     
-    # Save valid items
-    with open(output_file, "a", encoding="utf-8") as f:
-        for item in valid_items:
-            json_str = item.model_dump_json(exclude_none=True)
-            f.write(json_str + "\n")
+    # Save valid items (flushed now, like every path-based save)
+    writer = _get_writer(output_file)
+    writer.write_items(valid_items)
+    writer.flush()
     
     # Log summary
     if stats['warnings'] > 0:
-        print(f"Saved {stats['valid']}/{stats['total']} items ({stats['warnings']} warnings)")
+        logger.info("Saved %d/%d items (%d warnings)", stats['valid'], stats['total'], stats['warnings'])
     
     return stats['valid']
\ No newline at end of file
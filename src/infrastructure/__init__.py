@@ -1,7 +1,13 @@
 from .api_client import get_client
 from .logger import logger
+from .rate_limiter import AsyncRateLimiter
+from .utils import dedup_key, iter_jsonl_lines, scan_jsonl_files
 
 __all__ = [
     "get_client",
-    "logger"
-]
\ No newline at end of file
+    "logger",
+    "AsyncRateLimiter",
+    "dedup_key",
+    "iter_jsonl_lines",
+    "scan_jsonl_files",
+]
@@ -1,46 +1,67 @@
+from functools import lru_cache
+
+import httpx
 import instructor
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
 from ..config import GROQ_API_KEY, GOOGLE_API_KEY
 from .logger import logger
 
+try:
+    # Optional: enables HTTP/2 multiplexing (many concurrent requests over one TLS connection)
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Sized for many concurrent generate_batch coroutines; idle sockets are kept long enough
+# to survive rate-limiter waits between requests.
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=120.0)
+
+# Configuration Map
+# The 'openai/v1' suffix is critical for these compatibility endpoints
+PROVIDER_CONFIG = {
+    "groq": {
+        "api_key": GROQ_API_KEY,
+        "base_url": "https://api.groq.com/openai/v1",
+        "mode": instructor.Mode.JSON,
+    },
+    "google": {
+        "api_key": GOOGLE_API_KEY,
+        "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/", 
+        "mode": instructor.Mode.JSON,
+    }
+}
+
 
+@lru_cache(maxsize=8)
 def get_client(provider: str = "groq", async_mode: bool = True):
     """
     Returns a provider-agnostic Async client wrapped by Instructor.
+    Cached per provider: every batch shares one client and its keep-alive
+    connection pool instead of paying a new TCP + TLS handshake.
     """
     
-    # 1. Configuration Map
-    # The 'openai/v1' suffix is critical for these compatibility endpoints
-    CONFIG = {
-        "groq": {
-            "api_key": GROQ_API_KEY,
-            "base_url": "https://api.groq.com/openai/v1",
-            "mode": instructor.Mode.JSON,
-        },
-        "google": {
-            "api_key": GOOGLE_API_KEY,
-            "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/", 
-            "mode": instructor.Mode.JSON,
-        }
-    }
-
-    if provider not in CONFIG:
-        raise ValueError(f"Unknown provider '{provider}'. Supported: {list(CONFIG.keys())}")
+    if provider not in PROVIDER_CONFIG:
+        raise ValueError(f"Unknown provider '{provider}'. Supported: {list(PROVIDER_CONFIG)}")
 
-    settings = CONFIG[provider]
+    settings = PROVIDER_CONFIG[provider]
     
     if not settings["api_key"]:
         logger.error(f"API Key for {provider} is missing.")
         raise ValueError(f"{provider.upper()}_API_KEY not found in env.")
 
     try:
-        # 2. Universal Async Client
+        # 1. Universal Async Client
+        # SDK's own httpx defaults (timeout, redirects), with a larger pool and optional HTTP/2
+        http_client = DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS)
         base_client = AsyncOpenAI(
             base_url=settings["base_url"],
             api_key=settings["api_key"],
+            http_client=http_client,
         )
 
-        # 3. Patch
+        # 2. Patch
         client = instructor.patch(
             base_client, 
             mode=settings["mode"]
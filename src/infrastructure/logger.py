@@ -0,0 +1,61 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+from ..config import LOG_DIR
+
+LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+
+def setup_logger(name: str = "semantic_router",
+                 console_level: int = logging.INFO,
+                 file_level: int = logging.DEBUG) -> logging.Logger:
+    """
+    Configures the pipeline logger.
+
+    Callers only enqueue records; a background QueueListener owns the console and
+    file handlers, so stderr/disk latency never blocks generation or validation loops.
+    """
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        # Already configured (e.g. module reloaded)
+        return logger
+
+    logger.setLevel(min(console_level, file_level))
+    logger.propagate = False
+
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(formatter)
+
+    file_handler = logging.FileHandler(LOG_DIR / f"{name}.log", encoding="utf-8")
+    file_handler.setLevel(file_level)
+    file_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(queue_handler)
+
+    def _log_synchronously_in_child():
+        # Forked workers (e.g. ProcessPoolExecutor) don't inherit the listener thread,
+        # so attach the real handlers directly instead of enqueueing into the void.
+        logger.removeHandler(queue_handler)
+        for handler in listener.handlers:
+            logger.addHandler(handler)
+
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_log_synchronously_in_child)
+
+    return logger
+
+
+logger = setup_logger()
@@ -0,0 +1,42 @@
+import time
+import asyncio
+
+
+class AsyncRateLimiter:
+    """
+    Token-bucket limiter for async callers.
+    Allows bursts up to `max_rate` and refills at `max_rate / time_period` tokens per second,
+    so concurrent coroutines only wait as long as the provider budget actually requires.
+    """
+
+    def __init__(self, max_rate: int, time_period: float = 60.0):
+        if max_rate <= 0:
+            raise ValueError(f"max_rate must be positive, got {max_rate}.")
+
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.max_rate, self._tokens + elapsed * self.max_rate / self.time_period)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then consume it."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.max_rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
@@ -0,0 +1,34 @@
+import os
+import hashlib
+from pathlib import Path
+from typing import Iterator, List, Tuple, Union
+
+
+def dedup_key(data: bytes) -> bytes:
+    """
+    128-bit BLAKE2b digest used as a set key for deduplication.
+    Far smaller than holding the raw strings, and collisions are negligible at any dataset size.
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def iter_jsonl_lines(filepath: Union[str, Path]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Streams the non-empty lines of a JSONL file as raw bytes, with their 1-based line number.
+    Binary mode skips the UTF-8 decode (JSON parsers accept bytes), and nothing is
+    materialized, so memory stays flat regardless of file size.
+    """
+    with open(filepath, "rb") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                yield line_no, line
+
+
+def scan_jsonl_files(directory: Union[str, Path]) -> List[os.DirEntry]:
+    """
+    Lists the *.jsonl files in a directory with a single readdir.
+    DirEntry caches its stat result, so callers sorting by mtime/ctime pay one stat per file at most.
+    """
+    with os.scandir(directory) as it:
+        return [entry for entry in it if entry.name.endswith(".jsonl") and entry.is_file()]
@@ -1,3 +1,4 @@
+from typing import get_args
 
 from .schemas import (
     # --- Top Level Output ---
@@ -29,6 +30,12 @@ TOOL_SCHEMAS = [
     AskHumanTool,
 ]
 
+# tool_name -> wrapper class, straight from each class's tool_name Literal (the union discriminator)
+TOOL_BY_NAME = {
+    get_args(cls.model_fields["tool_name"].annotation)[0]: cls
+    for cls in TOOL_SCHEMAS
+}
+
 # Optional: Define __all__ for explicit module exports
 __all__ = [
     "AgentOutput",
@@ -44,6 +51,7 @@ __all__ = [
     "SandboxExecArguments",
     "AskHumanArguments",
     "TOOL_SCHEMAS",
+    "TOOL_BY_NAME",
 ]
 
 
@@ -3,27 +3,203 @@ Centralized validation logic for the Semantic Router training pipeline.
 Use this module across generation, translation, and training layers.
 """
 
-import json
-from typing import Dict, List, Optional, Tuple
+import re
+import logging
+from collections import Counter
+from typing import Dict, Final, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
+from pydantic import ValidationError
+
 from src.schemas import TrainingExample, AgentOutput
 from src.config import VALIDATION_CONFIG
-from src.infrastructure import logger
+from src.infrastructure import logger, iter_jsonl_lines, dedup_key
+
+# --- Thresholds (bound once at import; read as plain globals in the hot paths) ---
+MIN_QUERY_LENGTH: Final[int] = VALIDATION_CONFIG.MIN_QUERY_LENGTH
+MIN_THOUGHT_WORDS: Final[int] = VALIDATION_CONFIG.MIN_THOUGHT_WORDS
+MAX_THOUGHT_WORDS: Final[int] = VALIDATION_CONFIG.MAX_THOUGHT_WORDS
+MIN_FINAL_ANSWER_LENGTH: Final[int] = VALIDATION_CONFIG.MIN_FINAL_ANSWER_LENGTH
+PARROTING_THRESHOLD: Final[float] = VALIDATION_CONFIG.PARROTING_THRESHOLD
+
+
+def _phrase_re(*phrases: str) -> re.Pattern:
+    """One alternation per phrase list: a single C-level scan instead of a Python `any(... in ...)` loop."""
+    return re.compile("|".join(map(re.escape, phrases)))
+
+
+# Phrase scanners (matched against already-lowercased text unless noted)
+_PLACEHOLDER_RE = _phrase_re("lorem ipsum", "test", "placeholder", "xxx")
+_GENERIC_THOUGHT_RE = _phrase_re(
+    "i need to", "i should", "let me", "i will",
+    "the user wants", "the user is asking"
+)
+_VAGUE_ANSWER_RE = _phrase_re("i don't know", "not sure", "maybe", "perhaps", "i think")
+_DANGEROUS_CODE_RE = _phrase_re("rm -rf", "os.system", "__import__", "eval(")  # case-sensitive, raw code
+_DANGEROUS_KEYWORD_RE = _phrase_re("delete", "drop", "truncate", "format", "shutdown", "kill")
+_QUESTION_MARKER_RE = _phrase_re("?", "what", "how", "which", "should", "can", "could")
+
+# Whitespace-delimited token, same boundaries as str.split()
+_WORD_RE = re.compile(r"\S+")
 
+# Canonical record bytes for exact-duplicate detection (same encoding as the JSONL writer)
+_DUMP_JSON = TrainingExample.__pydantic_serializer__.to_json
 
-@dataclass
+# Exact-match (whole query) searches that are too generic to be useful
+_GENERIC_SEARCH_TERMS = frozenset({"code", "file", "function", "class", "todo"})
+
+
+@dataclass(slots=True, frozen=True)
 class ValidationResult:
     """Result of validation with detailed feedback."""
     is_valid: bool
     error_type: Optional[str] = None
     error_message: Optional[str] = None
-    warnings: List[str] = None
-    
-    def __post_init__(self):
-        if self.warnings is None:
-            self.warnings = []
+    warnings: Tuple[str, ...] = ()
+
+
+# Shared result for the (common) clean pass: immutable, so every layer can return the same object
+_OK = ValidationResult(True)
+
+
+@dataclass(slots=True)
+class _NormalizedText:
+    """Stripped/lowercased query and thought, computed once per item and shared by every layer."""
+    query: str
+    query_lower: str
+    thought: Optional[str] = None        # only for status == "running"
+    thought_lower: Optional[str] = None
+
+    @classmethod
+    def from_item(cls, item: TrainingExample) -> "_NormalizedText":
+        query = item.user_query.strip()
+        output = item.output
+        if output.status == "running" and output.thought is not None:
+            thought = output.thought.strip()
+            return cls(query, query.lower(), thought, thought.lower())
+        return cls(query, query.lower())
+
+
+# --- Tool-specific domain checks (dispatched by tool_name) ---
+
+def _validate_codebase_search(args, norm: _NormalizedText) -> ValidationResult:
+    """Search query must be specific enough to be useful."""
+    query = args.query.strip()
+    if len(query) < 2:
+        return ValidationResult(
+            is_valid=False,
+            error_type="domain",
+            error_message="Codebase search query too short"
+        )
+
+    # Check for overly generic searches
+    if query.lower() in _GENERIC_SEARCH_TERMS:
+        return ValidationResult(
+            is_valid=False,
+            error_type="domain",
+            error_message=f"Search query too generic: '{query}'"
+        )
+
+    return _OK
+
+
+def _validate_file_manager(args, norm: _NormalizedText) -> ValidationResult:
+    """Path is required; write needs content, patch needs a real target/replacement pair."""
+    # Path validation
+    if not args.path or args.path.strip() == "":
+        return ValidationResult(
+            is_valid=False,
+            error_type="domain",
+            error_message="File manager missing path"
+        )
+
+    # Operation-specific checks
+    if args.operation == "write":
+        if not args.content:
+            return ValidationResult(
+                is_valid=False,
+                error_type="domain",
+                error_message="Write operation missing content"
+            )
+
+    elif args.operation == "patch":
+        # target_string must not be None or empty
+        if not args.target_string:  
+            return ValidationResult(
+                is_valid=False,
+                error_type="domain",
+                error_message="Patch operation missing target_string"
+            )
+        # replacement_string must not be None; empty "" is VALID
+        if args.replacement_string is None:
+            return ValidationResult(
+                is_valid=False,
+                error_type="domain",
+                error_message="Patch operation missing replacement_string (empty string allowed)"
+            )
+
+        # Ensure target and replacement are different
+        if args.target_string == args.replacement_string:
+            return ValidationResult(
+                is_valid=False,
+                error_type="domain",
+                error_message="Patch target and replacement are identical"
+            )
+
+    return _OK
+
+
+def _validate_sandbox_exec(args, norm: _NormalizedText) -> ValidationResult:
+    """Code must be present and free of obviously dangerous calls."""
+    code = args.code.strip()
+    if not code:
+        return ValidationResult(
+            is_valid=False,
+            error_type="domain",
+            error_message="Sandbox execution missing code"
+        )
+
+    # Check for dangerous patterns (even in synthetic data)
+    if _DANGEROUS_CODE_RE.search(code):
+        return ValidationResult(
+            is_valid=False,
+            error_type="domain",
+            error_message="Sandbox code contains dangerous patterns"
+        )
+
+    return _OK
+
+
+def _validate_ask_human(args, norm: _NormalizedText) -> ValidationResult:
+    """Must read as a question, unless the user asked for something destructive."""
+    question = args.question.strip()
+    if len(question) < 5:
+        return ValidationResult(
+            is_valid=False,
+            error_type="domain",
+            error_message="ask_human question too short"
+        )
+
+    # Ensure it's actually a question; if it's not a typical question, allow it if the user_query contains a dangerous command
+    if not _QUESTION_MARKER_RE.search(question.lower()):
+        if not _DANGEROUS_KEYWORD_RE.search(norm.query_lower):
+            return ValidationResult(
+                is_valid=False,
+                error_type="domain",
+                error_message="ask_human content doesn't appear to be a question"
+            )
+
+    return _OK
+
+
+_TOOL_VALIDATORS = {
+    "codebase_search": _validate_codebase_search,
+    "file_manager": _validate_file_manager,
+    "sandbox_exec": _validate_sandbox_exec,
+    "ask_human": _validate_ask_human,
+}
+
 
 class DataValidator:
     """
@@ -31,12 +207,7 @@ class DataValidator:
     Separates concerns: structural vs quality vs domain-specific checks.
     """
     
-    # --- Configuration ---
-    MIN_QUERY_LENGTH = VALIDATION_CONFIG["MIN_QUERY_LENGTH"]
-    MIN_THOUGHT_WORDS = VALIDATION_CONFIG["MIN_THOUGHT_WORDS"]
-    MAX_THOUGHT_WORDS = VALIDATION_CONFIG["MAX_THOUGHT_WORDS"]
-    MIN_FINAL_ANSWER_LENGTH = VALIDATION_CONFIG["MIN_FINAL_ANSWER_LENGTH"]
-    PARROTING_THRESHOLD = VALIDATION_CONFIG["PARROTING_THRESHOLD"]
+    # Thresholds are the module-level constants above (set through VALIDATION_CONFIG / env)
     
     @staticmethod
     def validate_structural(item: TrainingExample) -> ValidationResult:
@@ -47,51 +218,57 @@ class DataValidator:
         """
         if not isinstance(item.output, AgentOutput):
              return ValidationResult(False, "structural", "Output is not AgentOutput")
-        return ValidationResult(True)
+        return _OK
 
     @classmethod
-    def validate_quality(cls, item: TrainingExample) -> ValidationResult:
+    def validate_quality(cls, item: TrainingExample, norm: Optional[_NormalizedText] = None) -> ValidationResult:
         """
         Layer 2: Quality validation (content quality, not just structure).
         This is where we check for good training data.
         """
+        if norm is None:
+            norm = _NormalizedText.from_item(item)
         warnings = []
+        output = item.output
         
         # Check 1: Query Quality
-        query = item.user_query.strip()
-        if len(query) < cls.MIN_QUERY_LENGTH:
+        query = norm.query
+        if len(query) < MIN_QUERY_LENGTH:
             return ValidationResult(
                 is_valid=False,
                 error_type="quality",
-                error_message=f"Query too short: {len(query)} chars (min: {cls.MIN_QUERY_LENGTH})"
+                error_message=f"Query too short: {len(query)} chars (min: {MIN_QUERY_LENGTH})"
             )
         
-        # Check for placeholder text
-        if any(ph in query.lower() for ph in ["lorem ipsum", "test", "placeholder", "xxx"]):
-            warnings.append("Query contains placeholder-like text")
-        
         # Status-specific quality checks
-        if item.output.status == "running":
+        status = output.status
+        if status == "running":
             # Check 2: Thought Quality
-            thought = item.output.thought.strip()
-            word_count = len(thought.split())
+            thought = norm.thought
+
+            # Count without building a token list; stop as soon as the max is exceeded
+            word_count = 0
+            for _ in _WORD_RE.finditer(thought):
+                word_count += 1
+                if word_count > MAX_THOUGHT_WORDS:
+                    break
             
-            if word_count < cls.MIN_THOUGHT_WORDS:
+            if word_count < MIN_THOUGHT_WORDS:
                 return ValidationResult(
                     is_valid=False,
                     error_type="quality",
-                    error_message=f"Thought too short: {word_count} words (min: {cls.MIN_THOUGHT_WORDS})"
+                    error_message=f"Thought too short: {word_count} words (min: {MIN_THOUGHT_WORDS})"
                 )
             
-            if word_count > cls.MAX_THOUGHT_WORDS:
+            if word_count > MAX_THOUGHT_WORDS:
                 return ValidationResult(
                     is_valid=False,
                     error_type="quality",
-                    error_message=f"Thought too long: {word_count} words (max: {cls.MAX_THOUGHT_WORDS})"
+                    error_message=f"Thought too long: more than {MAX_THOUGHT_WORDS} words"
                 )
             
             # Check 3: Parroting Detection
-            if cls._is_parroting(query, thought):
+            if cls._is_parroting(norm.query_lower, norm.thought_lower):
                 return ValidationResult(
                     is_valid=False,
                     error_type="quality",
@@ -99,17 +276,13 @@ class DataValidator:
                 )
             
             # Check 4: Generic thoughts
-            generic_phrases = [
-                "i need to", "i should", "let me", "i will",
-                "the user wants", "the user is asking"
-            ]
-            if any(phrase in thought.lower() for phrase in generic_phrases):
+            if _GENERIC_THOUGHT_RE.search(norm.thought_lower):
                 warnings.append("Thought contains generic phrasing")
         
-        elif item.output.status == "complete":
+        elif status == "complete":
             # Check 5: Final Answer Quality
-            answer = item.output.final_answer.strip()
-            if len(answer) < cls.MIN_FINAL_ANSWER_LENGTH:
+            answer = output.final_answer.strip()
+            if len(answer) < MIN_FINAL_ANSWER_LENGTH:
                 return ValidationResult(
                     is_valid=False,
                     error_type="quality",
@@ -117,154 +290,72 @@ class DataValidator:
                 )
             
             # Check for vague answers
-            vague_phrases = ["i don't know", "not sure", "maybe", "perhaps", "i think"]
-            if any(phrase in answer.lower() for phrase in vague_phrases):
+            if _VAGUE_ANSWER_RE.search(answer.lower()):
                 warnings.append("Final answer contains vague language")
         
-        return ValidationResult(is_valid=True, warnings=warnings)
+        # Warning-only scans run last, after every check that can reject
+        if _PLACEHOLDER_RE.search(norm.query_lower):
+            warnings.append("Query contains placeholder-like text")
+        
+        if not warnings:
+            return _OK
+        return ValidationResult(is_valid=True, warnings=tuple(warnings))
     
     @classmethod
-    def validate_domain_logic(cls, item: TrainingExample) -> ValidationResult:
+    def validate_domain_logic(cls, item: TrainingExample, norm: Optional[_NormalizedText] = None) -> ValidationResult:
         """
         Layer 3: Domain-specific validation (tool arguments sanity checks).
         This ensures tools are used correctly.
         """
-        if item.output.status != "running":
-            return ValidationResult(is_valid=True)
+        output = item.output
+        if output.status != "running":
+            return _OK
         
-        tool = item.output.tool_use
+        tool = output.tool_use
         tool_name = tool.tool_name
         args = tool.arguments
         
-        # Tool-specific validation
-        if tool_name == "codebase_search":
-            query = args.query.strip()
-            if len(query) < 2:
-                return ValidationResult(
-                    is_valid=False,
-                    error_type="domain",
-                    error_message="Codebase search query too short"
-                )
-            
-            # Check for overly generic searches
-            if query.lower() in ["code", "file", "function", "class", "todo"]:
-                return ValidationResult(
-                    is_valid=False,
-                    error_type="domain",
-                    error_message=f"Search query too generic: '{query}'"
-                )
-        
-        elif tool_name == "file_manager":
-            # Path validation
-            if not args.path or args.path.strip() == "":
-                return ValidationResult(
-                    is_valid=False,
-                    error_type="domain",
-                    error_message="File manager missing path"
-                )
-            
-            # Operation-specific checks
-            if args.operation == "write":
-                if not args.content:
-                    return ValidationResult(
-                        is_valid=False,
-                        error_type="domain",
-                        error_message="Write operation missing content"
-                    )
-            
-            elif args.operation == "patch":
-                # target_string must not be None or empty
-                if not args.target_string:  
-                    return ValidationResult(
-                        is_valid=False,
-                        error_type="domain",
-                        error_message="Patch operation missing target_string"
-                    )
-                # replacement_string must not be None; empty "" is VALID
-                if args.replacement_string is None:
-                    return ValidationResult(
-                        is_valid=False,
-                        error_type="domain",
-                        error_message="Patch operation missing replacement_string (empty string allowed)"
-                    )
-                
-                # Ensure target and replacement are different
-                if args.target_string == args.replacement_string:
-                    return ValidationResult(
-                        is_valid=False,
-                        error_type="domain",
-                        error_message="Patch target and replacement are identical"
-                    )
-        
-        elif tool_name == "sandbox_exec":
-            code = args.code.strip()
-            if not code:
-                return ValidationResult(
-                    is_valid=False,
-                    error_type="domain",
-                    error_message="Sandbox execution missing code"
-                )
-            
-            # Check for dangerous patterns (even in synthetic data)
-            dangerous_patterns = ["rm -rf", "os.system", "__import__", "eval("]
-            if any(pattern in code for pattern in dangerous_patterns):
-                return ValidationResult(
-                    is_valid=False,
-                    error_type="domain",
-                    error_message="Sandbox code contains dangerous patterns"
-                )
-        
-        elif tool_name == "ask_human":
-            question = args.question.strip()
-            if len(question) < 5:
-                return ValidationResult(
-                    is_valid=False,
-                    error_type="domain",
-                    error_message="ask_human question too short"
-                )
-            
-            # List of dangerous keywords in user_query
-            dangerous_keywords = ["delete", "drop", "truncate", "format", "shutdown", "kill"]
-            # Ensure it's actually a question; if it's not a typical question, allow it if the user_query contains a dangerous command
-            if not any(word in question.lower() for word in ["?", "what", "how", "which", "should", "can", "could"]):
-                if not any(word in item.user_query.lower() for word in dangerous_keywords):
-                    return ValidationResult(
-                        is_valid=False,
-                        error_type="domain",
-                        error_message="ask_human content doesn't appear to be a question"
-                    )
-        
-        return ValidationResult(is_valid=True)
+        # Tool-specific validation: one hash lookup instead of an elif ladder
+        handler = _TOOL_VALIDATORS.get(tool_name)
+        if handler is None:
+            return _OK
+        return handler(args, norm if norm is not None else _NormalizedText.from_item(item))
     
     @classmethod
-    def validate_full(cls, item: TrainingExample) -> ValidationResult:
+    def validate_full(cls, item: TrainingExample, skip_structural: bool = False) -> ValidationResult:
         """
         Run all validation layers in sequence.
         Short-circuits on first failure for efficiency.
+        Pass skip_structural=True for items Pydantic has just constructed.
         """
         # Layer 1: Structure
-        result = cls.validate_structural(item)
-        if not result.is_valid:
-            return result
+        if not skip_structural:
+            result = cls.validate_structural(item)
+            if not result.is_valid:
+                return result
         
+        # Normalize once; both remaining layers read the same stripped/lowercased text
+        norm = _NormalizedText.from_item(item)
+
         # Layer 2: Quality
-        result = cls.validate_quality(item)
+        result = cls.validate_quality(item, norm)
         if not result.is_valid:
             return result
         
         # Layer 3: Domain Logic
-        result = cls.validate_domain_logic(item)
-        return result
+        domain_result = cls.validate_domain_logic(item, norm)
+        # A pass keeps the quality layer's result so its warnings reach the caller
+        return result if domain_result.is_valid else domain_result
     
     @staticmethod
-    def _is_parroting(query: str, thought: str, threshold: float = 0.8) -> bool:
+    def _is_parroting(query_lower: str, thought_lower: str, threshold: float = PARROTING_THRESHOLD) -> bool:
         """
         Detect if thought is just parroting the query.
         Uses simple character overlap for efficiency.
+        Expects stripped, lowercased text (see _NormalizedText).
         """
-        # Normalize
-        q_norm = query.lower().strip()[:50]
-        t_norm = thought.lower().strip()[:50]
+        q_norm = query_lower[:50]
+        t_norm = thought_lower[:50]
         
         # Check exact prefix match
         if t_norm.startswith(q_norm[:20]):
@@ -301,34 +392,44 @@ def validate_batch(items: List[TrainingExample],
     """
     validator = DataValidator()
     valid_items = []
-    stats = {
+    seen_keys: set[bytes] = set()  # 128-bit digests of valid records already accepted
+    # Counter (still a dict for callers): stats from several batches merge with update()
+    stats = Counter({
         "total": len(items),
         "valid": 0,
         "invalid_structural": 0,
         "invalid_quality": 0,
         "invalid_domain": 0,
+        "duplicate": 0,
         "warnings": 0
-    }
+    })
     
     for i, item in enumerate(items):
         result = validator.validate_full(item)
         
         if result.is_valid:
+            # Exact duplicates only (byte-identical record); near-duplicates are handled downstream
+            key = dedup_key(_DUMP_JSON(item, exclude_none=True))
+            if key in seen_keys:
+                stats["duplicate"] += 1
+                continue
+            seen_keys.add(key)
+
             valid_items.append(item)
             stats["valid"] += 1
             
             if result.warnings:
                 stats["warnings"] += len(result.warnings)
-                if log_errors:
-                    logger.warning(f"Item {i}: {', '.join(result.warnings)}")
+                # Joining the warnings is the costly part, so skip it when WARNING is filtered out
+                if log_errors and logger.isEnabledFor(logging.WARNING):
+                    logger.warning("Item %d: %s", i, ", ".join(result.warnings))
         else:
             if result.error_type:
-                stats[f"invalid_{result.error_type}"] += 1
+                stats["invalid_" + result.error_type] += 1
             
             if log_errors:
-                print(f"❌ DROP REASON: {result.error_type} - {result.error_message}")
-                print(f"   Query: {item.user_query[:50]}...")
-                logger.error(f"Item {i} failed ({result.error_type}): {result.error_message}")
+                logger.error("Item %d failed (%s): %s", i, result.error_type, result.error_message)
+                logger.debug("   Query: %s...", item.user_query[:50])
     
     return valid_items, stats
 
@@ -349,35 +450,35 @@ def validate_jsonl_file(filepath: Path,
         "parse_errors": 0
     }
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for i, line in enumerate(f):
-            if max_items and i >= max_items:
-                break
-            
-            line = line.strip()
-            if not line:
-                continue
-            
-            stats["total"] += 1
-            
-            try:
-                data = json.loads(line)
-                item = TrainingExample(**data)
-                result = validator.validate_full(item)
-                
-                if result.is_valid:
-                    stats["valid"] += 1
-                else:
-                    stats[f"invalid_{result.error_type}"] += 1
-                    if result.error_type == "domain":
-                        snippet = json.dumps(data, ensure_ascii=False)[:120]
-                        logger.error(f"Line {i+1} domain error: {result.error_message}\n  snippet: {snippet}...")
+    # Stream line-by-line; only running counters are kept in memory
+    for line_no, line in iter_jsonl_lines(filepath):
+        if max_items and line_no > max_items:
+            break
+        
+        stats["total"] += 1
+        
+        # Parse + validate in one pydantic-core call: no intermediate dict per line
+        try:
+            item = TrainingExample.model_validate_json(line)
+            result = validator.validate_full(item)
             
-            except json.JSONDecodeError:
-                stats["parse_errors"] += 1
-                logger.error(f"Line {i+1}: JSON decode error")
-            except Exception as e:
-                stats["parse_errors"] += 1
-                logger.error(f"Line {i+1}: {str(e)}")
+            if result.is_valid:
+                stats["valid"] += 1
+            else:
+                stats[f"invalid_{result.error_type}"] += 1
+                # Snippet comes from the raw bytes (no re-serialization), and only when it will be logged
+                if result.error_type == "domain" and logger.isEnabledFor(logging.ERROR):
+                    snippet = line[:120].decode("utf-8", "replace")
+                    logger.error("Line %d domain error: %s\n  snippet: %s...", line_no, result.error_message, snippet)
+        
+        except ValidationError as e:
+            stats["parse_errors"] += 1
+            if e.errors()[0]["type"] == "json_invalid":
+                logger.error("Line %d: JSON decode error", line_no)
+            else:
+                logger.error("Line %d: %s", line_no, e)
+        except Exception as e:
+            stats["parse_errors"] += 1
+            logger.error("Line %d: %s", line_no, e)
     
     return stats
\ No newline at end of file
@@ -0,0 +1,16 @@
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.schemas import TrainingExample
+
+FEW_SHOTS = Path(__file__).resolve().parents[1] / "src" / "data" / "few_shots.json"
+
+
+@pytest.fixture
+def examples() -> List[TrainingExample]:
+    """One TrainingExample per few-shot record: every tool plus a direct answer."""
+    data = json.loads(FEW_SHOTS.read_text(encoding="utf-8"))
+    return [TrainingExample.model_validate(record) for records in data.values() for record in records]
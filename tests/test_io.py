@@ -0,0 +1,139 @@
+import os
+
+import pytest
+
+from src.data import io
+from src.data.io import JsonlWriter
+from src.schemas import TrainingExample
+from src.validators import ValidationResult
+
+
+def _read_back(path):
+    return [TrainingExample.model_validate_json(line) for line in path.read_bytes().splitlines()]
+
+
+class _ShortWrites:
+    """Wraps a raw file handle so every write() stores at most `limit` bytes, like a short FileIO write."""
+
+    def __init__(self, fh, limit: int = 7):
+        self._fh = fh
+        self._limit = limit
+
+    def write(self, data) -> int:
+        return self._fh.write(data[:self._limit])
+
+    def fileno(self) -> int:
+        return self._fh.fileno()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def test_writer_buffers_below_threshold_until_close(tmp_path, examples):
+    path = tmp_path / "out.jsonl"
+    writer = JsonlWriter(path, flush_threshold=1 << 20)
+    writer.open()
+    writer.write_items(examples)
+
+    assert path.read_bytes() == b""
+
+    writer.close()
+    assert _read_back(path) == examples
+
+
+def test_writer_flushes_once_threshold_is_crossed(tmp_path, examples):
+    path = tmp_path / "out.jsonl"
+    with JsonlWriter(path, flush_threshold=1) as writer:
+        writer.write_items(examples[:1])
+        # Written before close: the buffer crossed the threshold
+        assert _read_back(path) == examples[:1]
+        writer.write_items(examples[1:])
+
+    assert _read_back(path) == examples
+
+
+def test_writer_appends_to_existing_file(tmp_path, examples):
+    path = tmp_path / "out.jsonl"
+    with JsonlWriter(path) as writer:
+        writer.write_items(examples[:2])
+    with JsonlWriter(path) as writer:
+        writer.write_items(examples[2:])
+
+    assert _read_back(path) == examples
+
+
+def test_close_fsyncs_once_and_is_idempotent(tmp_path, examples, monkeypatch):
+    synced = []
+    monkeypatch.setattr(io.os, "fsync", synced.append)
+
+    writer = JsonlWriter(tmp_path / "out.jsonl")
+    writer.open()
+    fd = writer._fh.fileno()
+    writer.write_items(examples)
+    writer.close()
+    writer.close()
+
+    assert synced == [fd]
+
+
+def test_flush_keeps_writing_after_short_writes(tmp_path, examples):
+    path = tmp_path / "out.jsonl"
+    writer = JsonlWriter(path)
+    writer.open()
+    writer._fh = _ShortWrites(writer._fh)
+    writer.write_items(examples)
+    writer.close()
+
+    assert _read_back(path) == examples
+
+
+class _AcceptAll:
+    """Validator double: every item passes, so these tests only exercise the write path."""
+
+    @staticmethod
+    def validate_full(item, skip_structural=False):
+        return ValidationResult(True)
+
+
+@pytest.fixture
+def accept_all(monkeypatch):
+    monkeypatch.setattr(io, "_VALIDATOR", _AcceptAll())
+    yield
+    io.close_open_writers()
+
+
+def test_path_saves_reuse_one_writer_and_flush_each_call(tmp_path, examples, accept_all):
+    path = tmp_path / "out.jsonl"
+
+    assert io.save_batch_validated(examples[:2], path) == 2
+    writer = io._get_writer(path)
+    # On disk as soon as the call returns, though the handle stays open
+    assert _read_back(path) == examples[:2]
+
+    assert io.save_batch_validated(examples[2:], str(path)) == len(examples) - 2
+    assert io._get_writer(path) is writer
+    assert list(io._OPEN_WRITERS) == [os.path.abspath(path)]
+    assert _read_back(path) == examples
+
+
+def test_caller_owned_writer_keeps_buffering_across_calls(tmp_path, examples, accept_all):
+    path = tmp_path / "out.jsonl"
+    with JsonlWriter(path) as writer:
+        io.save_batch_from_models(examples[:2], writer)
+        io.save_batch_from_models(examples[2:], writer)
+        assert path.read_bytes() == b""
+        assert not io._OPEN_WRITERS
+
+    assert _read_back(path) == examples
+
+
+def test_close_open_writers_closes_and_forgets_path_writers(tmp_path, examples, accept_all):
+    path = tmp_path / "out.jsonl"
+    io.save_batch_validated(examples, path)
+    writer = io._get_writer(path)
+
+    io.close_open_writers()
+
+    assert not io._OPEN_WRITERS
+    assert writer._fh is None
+    assert _read_back(path) == examples
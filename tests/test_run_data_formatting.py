@@ -0,0 +1,94 @@
+import os
+
+import pyarrow.parquet as pq
+import pytest
+
+import run_data_formatting as formatting
+from src import validators
+from src.infrastructure import scan_jsonl_files
+
+
+@pytest.fixture
+def raw_dir(tmp_path, examples):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for name in ("a.jsonl", "b.jsonl"):
+        (raw / name).write_text("\n".join(item.model_dump_json(exclude_none=True) for item in examples) + "\n")
+    return raw
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "raw_aggregate.parquet"
+    path.parent.mkdir()
+    monkeypatch.setattr(formatting, "AGGREGATE_CACHE", path)
+    return path
+
+
+def _fingerprint(raw_dir):
+    return formatting._source_fingerprint(scan_jsonl_files(raw_dir))
+
+
+def test_cache_hit_returns_items_and_duplicate_count(raw_dir, examples, cache_path):
+    fingerprint = _fingerprint(raw_dir)
+    formatting._write_aggregate_cache(examples, 3, fingerprint)
+
+    assert formatting._load_aggregate_cache(fingerprint) == (examples, 3)
+    # Typed columns, not a single column of JSON strings
+    assert pq.read_schema(cache_path).names == ["user_query", "output"]
+
+
+def test_fingerprint_is_stable_for_unchanged_inputs(raw_dir):
+    assert _fingerprint(raw_dir) == _fingerprint(raw_dir)
+
+
+def test_changed_raw_file_invalidates_cache(raw_dir, examples):
+    formatting._write_aggregate_cache(examples, 0, _fingerprint(raw_dir))
+
+    raw_file = raw_dir / "a.jsonl"
+    with open(raw_file, "a") as f:
+        f.write(examples[0].model_dump_json(exclude_none=True) + "\n")
+
+    assert formatting._load_aggregate_cache(_fingerprint(raw_dir)) is None
+
+
+def test_touched_raw_file_invalidates_cache(raw_dir, examples):
+    formatting._write_aggregate_cache(examples, 0, _fingerprint(raw_dir))
+
+    raw_file = raw_dir / "b.jsonl"
+    st = raw_file.stat()
+    os.utime(raw_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert formatting._load_aggregate_cache(_fingerprint(raw_dir)) is None
+
+
+def test_added_raw_file_invalidates_cache(raw_dir, examples):
+    formatting._write_aggregate_cache(examples, 0, _fingerprint(raw_dir))
+
+    (raw_dir / "c.jsonl").write_text(examples[0].model_dump_json(exclude_none=True) + "\n")
+
+    assert formatting._load_aggregate_cache(_fingerprint(raw_dir)) is None
+
+
+def test_changed_validation_threshold_invalidates_cache(raw_dir, examples, monkeypatch):
+    formatting._write_aggregate_cache(examples, 0, _fingerprint(raw_dir))
+
+    monkeypatch.setattr(validators, "MIN_THOUGHT_WORDS", validators.MIN_THOUGHT_WORDS + 1)
+
+    assert formatting._load_aggregate_cache(_fingerprint(raw_dir)) is None
+
+
+def test_cache_version_bump_invalidates_cache(raw_dir, examples, monkeypatch):
+    formatting._write_aggregate_cache(examples, 0, _fingerprint(raw_dir))
+
+    monkeypatch.setattr(formatting, "AGGREGATE_CACHE_VERSION", formatting.AGGREGATE_CACHE_VERSION + 1)
+
+    assert formatting._load_aggregate_cache(_fingerprint(raw_dir)) is None
+
+
+def test_missing_or_unreadable_cache_is_a_miss(raw_dir, cache_path):
+    fingerprint = _fingerprint(raw_dir)
+    assert formatting._load_aggregate_cache(fingerprint) is None
+
+    cache_path.write_bytes(b"not parquet")
+    assert formatting._load_aggregate_cache(fingerprint) is None
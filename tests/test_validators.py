@@ -0,0 +1,64 @@
+import pytest
+
+from src.schemas import TrainingExample
+from src.validators import DataValidator, validate_batch
+
+VAGUE_ANSWER = "Final answer contains vague language"
+GENERIC_THOUGHT = "Thought contains generic phrasing"
+
+
+def _with_output(item: TrainingExample, **changes) -> TrainingExample:
+    return item.model_copy(update={"output": item.output.model_copy(update=changes)})
+
+
+@pytest.fixture
+def direct_answer(examples) -> TrainingExample:
+    return next(item for item in examples if item.output.status == "complete")
+
+
+@pytest.fixture
+def search_call(examples) -> TrainingExample:
+    return next(
+        item for item in examples
+        if item.output.status == "running" and item.output.tool_use.tool_name == "codebase_search"
+    )
+
+
+def test_clean_examples_pass_without_warnings(direct_answer, search_call):
+    for item in (direct_answer, search_call):
+        result = DataValidator.validate_full(item)
+        assert result.is_valid
+        assert result.warnings == ()
+
+
+def test_validate_full_surfaces_quality_warning_on_direct_answer(direct_answer):
+    item = _with_output(direct_answer, final_answer=direct_answer.output.final_answer + " Maybe.")
+
+    result = DataValidator.validate_full(item)
+
+    assert result.is_valid
+    assert result.warnings == (VAGUE_ANSWER,)
+
+
+def test_validate_full_keeps_quality_warning_after_domain_pass(search_call):
+    # Tool calls go through the domain layer too; its pass must not replace the quality warnings
+    item = _with_output(search_call, thought="Let me " + search_call.output.thought)
+
+    result = DataValidator.validate_full(item)
+
+    assert result.is_valid
+    assert result.warnings == (GENERIC_THOUGHT,)
+
+
+def test_validate_batch_counts_warnings(direct_answer, search_call):
+    items = [
+        _with_output(direct_answer, final_answer=direct_answer.output.final_answer + " Maybe."),
+        _with_output(search_call, thought="Let me " + search_call.output.thought),
+        search_call,
+    ]
+
+    valid_items, stats = validate_batch(items, log_errors=False)
+
+    assert valid_items == items
+    assert stats["valid"] == 3
+    assert stats["warnings"] == 2